@@ -20,29 +20,71 @@ from __future__ import annotations
 
 import argparse  # Command-line argument parsing
 import csv  # CSV input parsing
+import functools
+import itertools
 import json  # Config and JSONL logging
+import math
 import os
 import random  # Jitter for backoff
 import sys
+import threading
 import time  # Throttling between calls
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor  # Overlap API round-trips
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, Optional
 
-from google.oauth2 import service_account  # Auth with service account key
-from googleapiclient.discovery import build  # Builds the Android Publisher client
 from googleapiclient.errors import HttpError  # HTTP errors from Google API
 from tqdm import tqdm  # Progress bars
 
+# The auth and discovery modules are imported where they are used
+# (load_credentials, discovery_document, build_service). They are most of
+# the import time, and --help, config errors, and dry runs never need them.
+
+try:
+    import orjson  # Optional: faster JSON encoding for the audit log
+except ImportError:
+    orjson = None
+
 
 SCOPES = ["https://www.googleapis.com/auth/androidpublisher"]
-RETRY_STATUS = {429, 500, 503}
+RETRY_STATUS = frozenset({429, 500, 503})
+# Summary counter for a failed call, keyed by HTTP status (default: failed_permanent).
+FAILURE_TOTALS = {status: "failed_transient" for status in RETRY_STATUS}
+BATCH_LIMIT = 100  # Larger batches trip the "inner batch requests soft limit" error
+# Request bodies are identical for every token, so build them once.
+CANCEL_BODY = {
+    "cancellationContext": {
+        "cancellationType": "DEVELOPER_REQUESTED_STOP_PAYMENTS"
+    }
+}
+REVOKE_BODY = {"revocationContext": {"proratedRefund": {}}}
+# Partial-response mask for validate mode: just the fields the eligibility
+# check and log record read. Skipped with --log-response, which wants it all.
+VALIDATE_FIELDS = (
+    "subscriptionState,latestOrderId,"
+    "lineItems(expiryTime,latestSuccessfulOrderId,autoRenewingPlan(autoRenewEnabled))"
+)
+INPUT_BUFFER_BYTES = 1 << 20  # Read large token CSVs in 1 MiB chunks
 ELIGIBLE_STATES = {
     "SUBSCRIPTION_STATE_ACTIVE",
     "SUBSCRIPTION_STATE_IN_GRACE_PERIOD",
     "SUBSCRIPTION_STATE_ON_HOLD",
     "SUBSCRIPTION_STATE_PAUSED",
 }
+# Column order of the validate-mode eligible/ineligible CSVs.
+ELIGIBLE_FIELDS = (
+    "token",
+    "package",
+    "product",
+    "order_id",
+    "subscription_state",
+    "expiry_time",
+    "auto_renew_enabled",
+    "latest_order_id",
+)
+INELIGIBLE_FIELDS = ELIGIBLE_FIELDS + ("status", "http_status", "error_type", "message")
 DEFAULTS: Dict[str, Any] = {
     "config": None,
     "input": None,
@@ -70,6 +112,11 @@ DEFAULTS: Dict[str, Any] = {
     "checkpoint_success": None,
     "checkpoint_failed": None,
     "sample_size": None,
+    "seed": None,
+    "resume": False,
+    "rps": None,
+    "batch_size": 50,
+    "concurrency": 8,
 }
 
 
@@ -94,21 +141,81 @@ class GetResult:
     payload: Optional[Dict[str, Any]] = None
 
 
-def build_service(service_account_path: str):
-    """Create the Android Publisher API client using a service account key."""
+@dataclass
+class RowJob:
+    """Resolved CSV fields for one row waiting on its API result."""
+    idx: int
+    token: str
+    package_name: str
+    product: Optional[str]
+    order_id: Optional[str]
+    subscription_id: Optional[str]
+
+
+def load_credentials(service_account_path: str):
+    """
+    Load service account credentials once; they can be shared by every client.
+
+    The access token is fetched here so a bad or revoked key fails before any
+    row is processed, and worker clients start with a valid token instead of
+    each refreshing it on their first call.
+    """
+    from google.oauth2 import service_account  # Auth with service account key
+    from google_auth_httplib2 import Request as AuthRequest
+    from googleapiclient.http import build_http  # httplib2.Http with the library's default timeout
+
     credentials = service_account.Credentials.from_service_account_file(
         service_account_path, scopes=SCOPES
     )
-    return build(
-        "androidpublisher", "v3", credentials=credentials, cache_discovery=False
-    )
+    credentials.refresh(AuthRequest(build_http()))
+    return credentials
+
+
+@functools.lru_cache(maxsize=None)
+def discovery_document() -> str:
+    """
+    Android Publisher v3 discovery document, read once per process.
+
+    google-api-python-client bundles it, so startup never fetches it over
+    the network. The JSON text is cached rather than the parsed dict because
+    building a client modifies the dict it is given.
+    """
+    from googleapiclient.discovery_cache import get_static_doc
+
+    document = get_static_doc("androidpublisher", "v3")
+    if document is None:
+        raise RuntimeError(
+            "google-api-python-client does not bundle the androidpublisher v3 discovery document"
+        )
+    return document
+
+
+def build_service(credentials):
+    """
+    Create the Android Publisher API client from loaded credentials.
+
+    The client owns one authorized httplib2.Http, which keeps its TLS
+    connection alive between requests. httplib2 is not thread-safe, so each
+    worker thread needs its own client; reuse it for as many calls as
+    possible instead of building a new one per token.
+    """
+    from google_auth_httplib2 import AuthorizedHttp  # Attaches OAuth tokens to each request
+    from googleapiclient.discovery import build_from_document  # Builds the Android Publisher client
+    from googleapiclient.http import build_http
+
+    http = AuthorizedHttp(credentials, http=build_http())
+    return build_from_document(discovery_document(), http=http)
 
 
 def parse_http_error(err: HttpError) -> tuple[Optional[int], str]:
     """Extract status code and message from HttpError, with safe fallbacks."""
     status = getattr(err.resp, "status", None)
+    content = err.content
+    if not content:
+        return status, str(err)
     try:
-        payload = json.loads(err.content.decode("utf-8"))
+        # Both parsers take the raw bytes; no intermediate decode to str.
+        payload = orjson.loads(content) if orjson is not None else json.loads(content)
         message = payload.get("error", {}).get("message") or str(err)
     except Exception:
         message = str(err)
@@ -127,165 +234,382 @@ def classify_error(message: str) -> str:
     return "other"
 
 
-def cancel_with_retries(
-    service,
+def totals_key(status: str, http_status: Optional[int], error_type: Optional[str] = None) -> str:
+    """Name of the summary counter a result is tallied under."""
+    if status != "failure":
+        return status  # "success" or "dry_run"
+    if error_type == "already_cancelled":
+        return "already_cancelled"
+    return FAILURE_TOTALS.get(http_status, "failed_permanent")
+
+
+def build_request(
+    endpoint, mode: str, package_name: str, token: str, fields: Optional[str] = None
+):
+    """
+    Build (without executing) the API request a mode makes for one token.
+
+    fields is a partial-response mask for validate mode (None: full response).
+    """
+    if mode == "validate":
+        return endpoint.get(packageName=package_name, token=token, fields=fields)
+    if mode == "revoke-prorated":
+        return endpoint.revoke(packageName=package_name, token=token, body=REVOKE_BODY)
+    return endpoint.cancel(packageName=package_name, token=token, body=CANCEL_BODY)
+
+
+def call_with_retries(
+    endpoint,
+    mode: str,
     package_name: str,
     token: str,
     retries: int,
-    base_backoff: float,
+    backoff: list[float],
     jitter: float,
-) -> CancelResult:
-    """Call the cancellation endpoint with exponential backoff on transient errors."""
-    body = {
-        "cancellationContext": {
-            "cancellationType": "DEVELOPER_REQUESTED_STOP_PAYMENTS"
-        }
-    }
+    fields: Optional[str] = None,
+):
+    """
+    Make one mode's API call with exponential backoff on transient errors
+    (429/500/503 and transport errors such as timeouts).
 
+    endpoint is the service.purchases().subscriptionsv2() resource, built once
+    per client rather than once per call. backoff is the per-retry delay
+    schedule from backoff_schedule(), computed once per run. Returns a
+    GetResult for validate mode, CancelResult otherwise.
+    """
+    result_cls = GetResult if mode == "validate" else CancelResult
+    sleep = time.sleep
+    rand = random.random
     for attempt in range(1, retries + 2):
         try:
-            service.purchases().subscriptionsv2().cancel(
-                packageName=package_name, token=token, body=body
-            ).execute()
+            response = build_request(endpoint, mode, package_name, token, fields).execute()
+            if mode == "validate":
+                return GetResult(
+                    status="success",
+                    attempts=attempt,
+                    http_status=200,
+                    payload=response,
+                )
             return CancelResult(status="success", attempts=attempt, http_status=204)
         except HttpError as err:
             status, message = parse_http_error(err)
             if status in RETRY_STATUS and attempt <= retries:
                 # Exponential backoff with jitter for 429/5xx
-                delay = base_backoff * (2 ** (attempt - 1))
-                delay = delay + random.uniform(0, jitter)
-                time.sleep(delay)
+                sleep(backoff[attempt - 1] + rand() * jitter)
                 continue
-            error_type = classify_error(message)
-            return CancelResult(
+            return result_cls(
                 status="failure",
                 attempts=attempt,
                 http_status=status,
                 message=message,
-                error_type=error_type,
+                error_type=classify_error(message),
             )
-        except Exception as err:  # Catch-all to avoid halting the batch
-            return CancelResult(
+        except Exception as err:  # Transport errors (timeout, reset): retry like a 503
+            if attempt <= retries:
+                sleep(backoff[attempt - 1] + rand() * jitter)
+                continue
+            return result_cls(
                 status="failure",
                 attempts=attempt,
                 http_status=None,
                 message=str(err),
                 error_type="exception",
             )
-    return CancelResult(status="failure", attempts=retries + 1, error_type="unknown")
+    return result_cls(status="failure", attempts=retries + 1, error_type="unknown")
 
 
-def get_with_retries(
+def batch_with_retries(
     service,
-    package_name: str,
-    token: str,
+    mode: str,
+    jobs: list[tuple[str, str]],
     retries: int,
-    base_backoff: float,
+    backoff: list[float],
     jitter: float,
-) -> GetResult:
-    """Fetch subscription details with retries on transient errors."""
+    fields: Optional[str] = None,
+) -> list:
+    """
+    Run many tokens through one batched HTTP request instead of one per token.
+
+    jobs: list of (package_name, token). Returns one result per job, in the
+    same order: GetResult for validate mode, CancelResult otherwise.
+    Sub-requests that fail with 429/500/503 are re-sent in a smaller retry
+    batch after an exponential backoff; the rest resolve on the first pass.
+    A transport error on the batch itself re-sends only the items that have
+    no result yet.
+    """
+    endpoint = service.purchases().subscriptionsv2()
+    result_cls = GetResult if mode == "validate" else CancelResult
+    results: list = [None] * len(jobs)
+    pending = list(range(len(jobs)))
+
     for attempt in range(1, retries + 2):
-        try:
-            payload = service.purchases().subscriptionsv2().get(
-                packageName=package_name, token=token
-            ).execute()
-            return GetResult(
-                status="success",
-                attempts=attempt,
-                http_status=200,
-                payload=payload,
-            )
-        except HttpError as err:
-            status, message = parse_http_error(err)
-            if status in RETRY_STATUS and attempt <= retries:
-                delay = base_backoff * (2 ** (attempt - 1))
-                delay = delay + random.uniform(0, jitter)
-                time.sleep(delay)
-                continue
-            error_type = classify_error(message)
-            return GetResult(
-                status="failure",
-                attempts=attempt,
-                http_status=status,
-                message=message,
-                error_type=error_type,
-            )
-        except Exception as err:
-            return GetResult(
+        transient: list[int] = []
+
+        def on_response(request_id, response, exception, attempt=attempt):
+            i = int(request_id)
+            if exception is None:
+                if mode == "validate":
+                    results[i] = GetResult(
+                        status="success", attempts=attempt, http_status=200, payload=response
+                    )
+                else:
+                    results[i] = CancelResult(status="success", attempts=attempt, http_status=204)
+                return
+            if isinstance(exception, HttpError):
+                status, message = parse_http_error(exception)
+                if status in RETRY_STATUS and attempt <= retries:
+                    transient.append(i)
+                    return
+                results[i] = result_cls(
+                    status="failure",
+                    attempts=attempt,
+                    http_status=status,
+                    message=message,
+                    error_type=classify_error(message),
+                )
+                return
+            results[i] = result_cls(
                 status="failure",
                 attempts=attempt,
-                http_status=None,
-                message=str(err),
+                message=str(exception),
                 error_type="exception",
             )
-    return GetResult(status="failure", attempts=retries + 1, error_type="unknown")
-
 
-def revoke_prorated_with_retries(
-    service,
-    package_name: str,
-    token: str,
-    retries: int,
-    base_backoff: float,
-    jitter: float,
-) -> CancelResult:
-    """Revoke and issue a prorated refund, with retries on transient errors."""
-    body = {"revocationContext": {"proratedRefund": {}}}
-    for attempt in range(1, retries + 2):
+        batch = service.new_batch_http_request(callback=on_response)
+        for i in pending:
+            package_name, token = jobs[i]
+            batch.add(
+                build_request(endpoint, mode, package_name, token, fields), request_id=str(i)
+            )
         try:
-            service.purchases().subscriptionsv2().revoke(
-                packageName=package_name, token=token, body=body
-            ).execute()
-            return CancelResult(status="success", attempts=attempt, http_status=204)
+            batch.execute()
         except HttpError as err:
+            # The batch envelope itself failed; every item without a result shares
+            # that outcome. Items whose callback already ran keep their result.
             status, message = parse_http_error(err)
+            unresolved = [i for i in pending if results[i] is None]
             if status in RETRY_STATUS and attempt <= retries:
-                delay = base_backoff * (2 ** (attempt - 1))
-                delay = delay + random.uniform(0, jitter)
-                time.sleep(delay)
-                continue
-            error_type = classify_error(message)
-            return CancelResult(
-                status="failure",
-                attempts=attempt,
-                http_status=status,
-                message=message,
-                error_type=error_type,
-            )
-        except Exception as err:
-            return CancelResult(
-                status="failure",
-                attempts=attempt,
-                http_status=None,
-                message=str(err),
-                error_type="exception",
-            )
-    return CancelResult(status="failure", attempts=retries + 1, error_type="unknown")
+                transient = unresolved
+            else:
+                for i in unresolved:
+                    results[i] = result_cls(
+                        status="failure",
+                        attempts=attempt,
+                        http_status=status,
+                        message=message,
+                        error_type=classify_error(message),
+                    )
+        except Exception as err:  # Transport errors (timeout, reset): retry like a 503
+            # Callbacks run one by one, so an error partway through (say, decoding
+            # a response) leaves earlier items resolved; never re-send those.
+            unresolved = [i for i in pending if results[i] is None]
+            if attempt <= retries:
+                transient = unresolved
+            else:
+                for i in unresolved:
+                    results[i] = result_cls(
+                        status="failure",
+                        attempts=attempt,
+                        message=str(err),
+                        error_type="exception",
+                    )
 
+        if not transient:
+            break
+        pending = transient
+        delay = backoff[attempt - 1] + random.random() * jitter
+        time.sleep(delay)
 
-def load_rows(path: str) -> Iterable[Dict[str, Any]]:
-    """Stream rows from CSV to keep memory usage small."""
-    with open(path, newline="") as fh:
-        reader = csv.DictReader(fh)
+    return [
+        result or result_cls(status="failure", attempts=retries + 1, error_type="unknown")
+        for result in results
+    ]
+
+
+def project_row(row: list[str], columns: list[Optional[int]]) -> tuple[Optional[str], ...]:
+    """Keep only the cells at `columns`; None where the column or cell is absent."""
+    width = len(row)
+    return tuple(row[i] if i is not None and i < width else None for i in columns)
+
+
+def load_rows(
+    path: str,
+    columns: list[Optional[int]],
+    on_progress: Optional[Callable[[int], Any]] = None,
+) -> Iterable[tuple[Optional[str], ...]]:
+    """
+    Stream data rows from CSV, projected down to the needed columns.
+
+    columns holds the indices resolved from the header (None for a column the
+    file lacks); each row is reduced to a tuple of just those cells, so wide
+    report exports do not carry unused fields through the run. Blank lines
+    are skipped, as csv.DictReader did. If on_progress is given it is called
+    with the number of bytes read from disk since the last call, which lets
+    the progress bar track the file without a separate counting pass.
+    """
+    with open(path, newline="", buffering=INPUT_BUFFER_BYTES) as fh:
+        reader = csv.reader(fh)
+        next(reader, None)  # Header
+        consumed = 0
         for row in reader:
-            yield row
+            if on_progress is not None:
+                position = fh.buffer.tell()
+                if position != consumed:
+                    on_progress(position - consumed)
+                    consumed = position
+            if row:
+                yield project_row(row, columns)
+
+
+def backoff_schedule(retries: int, base_backoff: float) -> list[float]:
+    """Exponential backoff before retry N (index N-1): base, 2*base, 4*base, ..."""
+    return [base_backoff * (1 << i) for i in range(max(retries, 0))]
+
+
+_iso_second = -1
+_iso_prefix = ""
 
 
 def now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    """
+    Current UTC time as ISO-8601 with microseconds, e.g. 2025-12-19T10:00:00.123456+00:00.
 
+    The date/time part only changes once a second, so it is formatted once
+    and cached; per call only the microseconds are added.
+    """
+    global _iso_second, _iso_prefix
+    second, nanos = divmod(time.time_ns(), 1_000_000_000)
+    if second != _iso_second:
+        _iso_prefix = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _iso_second = second
+    return f"{_iso_prefix}.{nanos // 1000:06d}+00:00"
 
-def log_record(fh, record: Dict[str, Any]) -> None:
-    """Append a single JSON record to the audit log."""
-    fh.write(json.dumps(record, ensure_ascii=True))
-    fh.write("\n")
-    fh.flush()
 
+class TokenBucket:
+    """
+    Rate limiter allowing `rate` acquisitions per second on average, with
+    bursts of up to one second's worth.
 
-def count_rows(path: str) -> int:
-    """Count rows in CSV (excludes header)."""
-    with open(path, newline="") as fh:
-        return sum(1 for _ in csv.DictReader(fh))
+    Unlike a fixed sleep after every row, time already spent waiting on the
+    API counts toward the budget, so a slow response is not followed by a
+    full extra delay.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.allowance = self.capacity
+        self.last = time.monotonic()
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until it is available."""
+        now = time.monotonic()
+        self.allowance = min(self.capacity, self.allowance + (now - self.last) * self.rate)
+        self.last = now
+        self.allowance -= 1
+        if self.allowance < 0:
+            # The deficit is refilled by the time slept, which the next call counts.
+            time.sleep(-self.allowance / self.rate)
+
+
+class NullProgress:
+    """Stand-in for tqdm when the progress bar is off; every call is a no-op."""
+
+    def update(self, n: int = 1) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def make_progress(enabled: bool, **kwargs: Any):
+    """
+    Progress bar for the run, or a NullProgress when disabled.
+
+    Redraws are limited to twice a second; at thousands of rows per second
+    the default 0.1s interval spends noticeable time formatting the bar.
+    """
+    if not enabled:
+        return NullProgress()
+    return tqdm(mininterval=0.5, **kwargs)
+
+
+class JsonlWriter:
+    """
+    Buffered JSONL audit log.
+
+    Records are encoded into an in-memory buffer instead of being written and
+    flushed one row at a time. The buffer goes to disk, followed by an fsync,
+    every `sync_every` records (or sooner if it reaches `flush_bytes`), so a
+    hard crash loses at most that many log lines. Use as a context manager
+    so the tail of the buffer is written even on Ctrl-C. With append=True
+    new records go after the existing ones (for --resume). Files in
+    `companions` (the checkpoints) are flushed right after each sync, so
+    they never record a token the log does not have yet.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_bytes: int = 1 << 20,
+        sync_every: int = 500,
+        append: bool = False,
+        companions: Iterable[Any] = (),
+    ):
+        # Buffered handle: unlike a raw FileIO write, its write() and flush()
+        # retry short writes until every byte is out, or raise.
+        self._fh = open(path, "ab" if append else "wb")
+        self._companions = list(companions)
+        self._buf = bytearray()
+        self._flush_bytes = flush_bytes
+        self._sync_every = sync_every
+        self._unsynced = 0
+        if append and self._fh.tell() > 0:
+            # A crash can leave a partial last line; start on a fresh one.
+            with open(path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    self._buf += b"\n"
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Queue one JSON record; writes to disk once the buffer is full."""
+        if orjson is not None:
+            self._buf += orjson.dumps(record)
+        else:
+            self._buf += json.dumps(record, ensure_ascii=True).encode("ascii")
+        self._buf += b"\n"
+        self._unsynced += 1
+        if self._unsynced >= self._sync_every:
+            self.sync()
+        elif len(self._buf) >= self._flush_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffer to the file (OS page cache)."""
+        if self._buf:
+            self._fh.write(self._buf)
+            self._fh.flush()
+            self._buf.clear()
+
+    def sync(self) -> None:
+        """Write the buffer and fsync so the records survive a crash."""
+        self.flush()
+        os.fsync(self._fh.fileno())
+        self._unsynced = 0
+        for fh in self._companions:
+            fh.flush()
+
+    def close(self) -> None:
+        try:
+            self.sync()
+        finally:
+            self._fh.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 
 def choose_field(fieldnames: Iterable[str], candidates: list[str]) -> Optional[str]:
@@ -296,28 +620,33 @@ def choose_field(fieldnames: Iterable[str], candidates: list[str]) -> Optional[s
     return None
 
 
+def choose_index(fieldnames: list[str], candidates: list[str]) -> Optional[int]:
+    """Column index of the first matching fieldname, or None if none match."""
+    name = choose_field(fieldnames, candidates)
+    return fieldnames.index(name) if name else None
+
+
 def validate_headers(
     path: str,
     token_candidates: list[str],
     subscription_candidates: list[str],
     extra_required: Optional[list[str]] = None,
-) -> tuple[list[str], str, Optional[str]]:
+) -> tuple[list[str], int, Optional[int]]:
     """
-    Validate CSV headers and resolve fieldnames for token and subscription id.
+    Validate CSV headers and resolve column indices for token and subscription id.
 
-    Returns: (fieldnames, token_field, subscription_field or None)
+    Returns: (fieldnames, token_idx, subscription_idx or None)
     """
     with open(path, newline="") as fh:
-        reader = csv.DictReader(fh)
-        fieldnames = reader.fieldnames or []
+        fieldnames = next(csv.reader(fh), [])
 
-    token_field = choose_field(fieldnames, token_candidates)
-    if not token_field:
+    token_idx = choose_index(fieldnames, token_candidates)
+    if token_idx is None:
         raise ValueError(
             "CSV is missing a token column. Tried: " + ", ".join(token_candidates)
         )
 
-    subscription_field = choose_field(fieldnames, subscription_candidates)
+    subscription_idx = choose_index(fieldnames, subscription_candidates)
 
     if extra_required:
         missing = [col for col in extra_required if col not in fieldnames]
@@ -326,7 +655,39 @@ def validate_headers(
                 f"CSV missing required columns: {', '.join(missing)}. Found: {', '.join(fieldnames)}"
             )
 
-    return fieldnames, token_field, subscription_field
+    return fieldnames, token_idx, subscription_idx
+
+
+def load_logged_tokens(path: str) -> set[str]:
+    """
+    Tokens that already have an outcome in an existing JSONL log (for --resume).
+
+    Dry-run rows, transient failures (429/500/503) and transport errors
+    (errorType "exception") are left out so they are attempted again.
+    Malformed lines, such as one cut short by a crash, are ignored.
+    """
+    done: set[str] = set()
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return done
+    with fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line) if orjson is not None else json.loads(line)
+            except ValueError:
+                continue
+            token = record.get("purchaseToken")
+            if not token or record.get("status") == "dry_run":
+                continue
+            if record.get("status") == "failure" and (
+                record.get("httpStatus") in RETRY_STATUS or record.get("errorType") == "exception"
+            ):
+                continue
+            done.add(token)
+    return done
 
 
 def load_checkpoint(path: Optional[str]) -> set[str]:
@@ -346,9 +707,12 @@ def load_checkpoint(path: Optional[str]) -> set[str]:
 
 
 def append_checkpoint(fh, token: str) -> None:
-    """Record a processed token to the checkpoint file."""
+    """
+    Record a processed token to the checkpoint file.
+
+    Not flushed here: the JsonlWriter flushes checkpoints after each log sync.
+    """
     fh.write(token + "\n")
-    fh.flush()
 
 
 def build_log_path(
@@ -392,37 +756,43 @@ def ensure_parent_dir(path: str) -> None:
         os.makedirs(parent, exist_ok=True)
 
 
-def pick_package(row: Dict[str, Any], package_field: Optional[str], fallback: Optional[str]) -> Optional[str]:
-    """Resolve package name from row or fallback."""
-    if package_field and row.get(package_field):
-        return str(row.get(package_field)).strip()
-    return fallback
+def _open_unit(rng: random.Random) -> float:
+    """Uniform float in (0, 1); random() can return exactly 0.0."""
+    while True:
+        u = rng.random()
+        if u > 0.0:
+            return u
 
 
-def pick_field(row: Dict[str, Any], field: Optional[str]) -> Optional[str]:
-    if not field:
-        return None
-    value = row.get(field)
-    if value is None:
-        return None
-    return str(value).strip()
-
+def sample_rows(
+    path: str,
+    sample_size: int,
+    columns: list[Optional[int]],
+    rng: Optional[random.Random] = None,
+) -> list[tuple[Optional[str], ...]]:
+    """
+    Reservoir-sample projected rows from a CSV without loading the entire file.
 
-def sample_rows(path: str, sample_size: int) -> list[Dict[str, Any]]:
-    """Reservoir-sample rows from a CSV without loading the entire file."""
+    Uses Algorithm L: instead of drawing a random number for every row, it
+    draws how many rows to skip before the next replacement, so a 1000-row
+    sample of a 10M-row file needs thousands of draws rather than millions.
+    Pass a seeded rng for a reproducible sample.
+    """
     if sample_size <= 0:
         return []
-    reservoir: list[Dict[str, Any]] = []
-    with open(path, newline="") as fh:
-        reader = csv.DictReader(fh)
-        for i, row in enumerate(reader, start=1):
-            if i <= sample_size:
-                reservoir.append(row)
-            else:
-                j = random.randint(1, i)
-                if j <= sample_size:
-                    reservoir[j - 1] = row
-    return reservoir
+    rng = rng or random.Random()
+    rows = iter(load_rows(path, columns))
+    reservoir = list(itertools.islice(rows, sample_size))
+    if len(reservoir) < sample_size:
+        return reservoir
+    w = math.exp(math.log(_open_unit(rng)) / sample_size)
+    while True:
+        skip = int(math.log(_open_unit(rng)) / math.log1p(-w))
+        row = next(itertools.islice(rows, skip, None), None)
+        if row is None:
+            return reservoir
+        reservoir[rng.randrange(sample_size)] = row
+        w *= math.exp(math.log(_open_unit(rng)) / sample_size)
 
 
 def apply_config(args: argparse.Namespace, cfg: Optional[Dict[str, Any]]) -> argparse.Namespace:
@@ -464,11 +834,14 @@ def validate_required(args: argparse.Namespace) -> None:
 
 def run(args: argparse.Namespace) -> int:
     """Main orchestration: auth, iterate CSV, act, log, and summarize."""
-    if args.dry_run:
-        service = None
-    else:
+    # Clients built up front and not yet claimed by a worker thread.
+    spare_clients: list[Any] = []
+    credentials = None
+    if not args.dry_run:
         try:
-            service = build_service(args.service_account)
+            # Fail fast on bad credentials; the first worker reuses this client.
+            credentials = load_credentials(args.service_account)
+            spare_clients.append(build_service(credentials))
         except Exception as exc:  # Avoid proceeding if auth fails
             sys.stderr.write(f"Failed to build Android Publisher service: {exc}\n")
             return 1
@@ -481,6 +854,7 @@ def run(args: argparse.Namespace) -> int:
         "failed_permanent": 0,
         "dry_run": 0,
         "skipped": 0,
+        "duplicates": 0,
     }
 
     # Validate headers and pick which column names to use.
@@ -514,23 +888,36 @@ def run(args: argparse.Namespace) -> int:
         extra_required = (
             validation_required if args.mode == "revoke-prorated" else None
         )
-        fieldnames, token_field, subscription_field = validate_headers(
+        fieldnames, token_idx, subscription_idx = validate_headers(
             args.input, token_candidates, subscription_candidates, extra_required
         )
     except ValueError as exc:
         sys.stderr.write(str(exc) + "\n")
         return 2
 
-    package_field = choose_field(fieldnames, package_candidates)
-    product_field = choose_field(fieldnames, product_candidates)
-    order_id_field = choose_field(fieldnames, order_id_candidates)
+    package_idx = choose_index(fieldnames, package_candidates)
+    product_idx = choose_index(fieldnames, product_candidates)
+    order_id_idx = choose_index(fieldnames, order_id_candidates)
 
-    if not args.package_name and not package_field:
+    # Every row is projected to (token, package, product, order_id, subscription_id).
+    columns = [token_idx, package_idx, product_idx, order_id_idx, subscription_idx]
+
+    if not args.package_name and package_idx is None:
         sys.stderr.write(
             "No package name provided and no package column found in CSV.\n"
         )
         return 2
 
+    if not 1 <= args.batch_size <= BATCH_LIMIT:
+        sys.stderr.write(f"--batch-size must be between 1 and {BATCH_LIMIT}.\n")
+        return 2
+    if args.resume and not args.log:
+        sys.stderr.write("--resume needs --log pointing at the log of the run to continue.\n")
+        return 2
+    if args.concurrency < 1:
+        sys.stderr.write("--concurrency must be at least 1.\n")
+        return 2
+
     run_stamp = (
         datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         if args.timestamp_logs
@@ -541,25 +928,42 @@ def run(args: argparse.Namespace) -> int:
     success_checkpoint = args.checkpoint_success or args.checkpoint
     failed_checkpoint = args.checkpoint_failed
     processed_tokens = load_checkpoint(success_checkpoint)
+    if args.resume:
+        processed_tokens |= load_logged_tokens(log_path)
     if success_checkpoint:
         ensure_parent_dir(success_checkpoint)
     if failed_checkpoint:
         ensure_parent_dir(failed_checkpoint)
-    checkpoint_success_fh = open(success_checkpoint, "a") if success_checkpoint else None
-    checkpoint_failed_fh = open(failed_checkpoint, "a") if failed_checkpoint else None
+    # Large buffers so checkpoints only reach disk when the log syncs.
+    checkpoint_success_fh = (
+        open(success_checkpoint, "a", buffering=1 << 20) if success_checkpoint else None
+    )
+    checkpoint_failed_fh = (
+        open(failed_checkpoint, "a", buffering=1 << 20) if failed_checkpoint else None
+    )
 
+    track_bytes = False
     if args.sample_size:
-        rows = sample_rows(args.input, args.sample_size)
+        rows = sample_rows(args.input, args.sample_size, columns, random.Random(args.seed))
         if args.max_rows:
             rows = rows[: args.max_rows]
-        total_rows = len(rows)
+        progress = make_progress(args.progress, total=len(rows), unit="row", desc=args.mode)
+    elif args.max_rows:
+        rows = load_rows(args.input, columns)
+        progress = make_progress(args.progress, total=args.max_rows, unit="row", desc=args.mode)
     else:
-        rows = load_rows(args.input)
-        total_rows = count_rows(args.input) if args.progress else None
-        if args.progress and args.max_rows and total_rows is not None:
-            total_rows = min(total_rows, args.max_rows)
-
-    progress = tqdm(total=total_rows, unit="row", desc=args.mode, disable=not args.progress)
+        # Size the bar by bytes so the input is only read once (no counting pass).
+        track_bytes = True
+        progress = make_progress(
+            args.progress,
+            total=os.path.getsize(args.input),
+            unit="B",
+            unit_scale=True,
+            desc=args.mode,
+        )
+        rows = load_rows(
+            args.input, columns, on_progress=progress.update if args.progress else None
+        )
 
     eligible_fh = None
     eligible_writer = None
@@ -575,21 +979,11 @@ def run(args: argparse.Namespace) -> int:
             eligible_path = append_timestamp(eligible_path, run_stamp)
         eligible_path = apply_stamp_dir(eligible_path, run_stamp, "outputs")
         ensure_parent_dir(eligible_path)
-        eligible_fh = open(eligible_path, "w", newline="")
-        eligible_writer = csv.DictWriter(
-            eligible_fh,
-            fieldnames=[
-                "token",
-                "package",
-                "product",
-                "order_id",
-                "subscription_state",
-                "expiry_time",
-                "auto_renew_enabled",
-                "latest_order_id",
-            ],
-        )
-        eligible_writer.writeheader()
+        eligible_fh = open(eligible_path, "w", newline="", buffering=1 << 20)
+        # Plain csv.writer with tuples in ELIGIBLE_FIELDS order; DictWriter
+        # would build and re-order a dict for every row.
+        eligible_writer = csv.writer(eligible_fh)
+        eligible_writer.writerow(ELIGIBLE_FIELDS)
 
         ineligible_path = args.ineligible_output
         if not ineligible_path:
@@ -600,220 +994,328 @@ def run(args: argparse.Namespace) -> int:
             ineligible_path = append_timestamp(ineligible_path, run_stamp)
         ineligible_path = apply_stamp_dir(ineligible_path, run_stamp, "outputs")
         ensure_parent_dir(ineligible_path)
-        ineligible_fh = open(ineligible_path, "w", newline="")
-        ineligible_writer = csv.DictWriter(
-            ineligible_fh,
-            fieldnames=[
-                "token",
-                "package",
-                "product",
-                "order_id",
-                "subscription_state",
-                "expiry_time",
-                "auto_renew_enabled",
-                "latest_order_id",
-                "status",
-                "http_status",
-                "error_type",
-                "message",
-            ],
+        ineligible_fh = open(ineligible_path, "w", newline="", buffering=1 << 20)
+        ineligible_writer = csv.writer(ineligible_fh)
+        ineligible_writer.writerow(INELIGIBLE_FIELDS)
+
+    # The per-row code below reads these on every row; bind them once rather
+    # than going through the argparse Namespace each time.
+    mode = args.mode
+    dry_run = args.dry_run
+    max_rows = args.max_rows or 0
+    expected_package = args.package_name
+    batch_size = args.batch_size
+    rps = args.rps if args.rps is not None else (1 / args.delay if args.delay > 0 else 0)
+    # Bound method, or None when unthrottled (e.g. --delay 0 dry runs).
+    pace = TokenBucket(rps).acquire if rps > 0 else None
+    retries = args.retries
+    jitter = args.jitter
+    log_response = args.log_response
+    fields = None if log_response else VALIDATE_FIELDS
+
+    # Byte-sized bars advance from load_rows once per buffer read, not per row.
+    count_rows = args.progress and not track_bytes
+    use_batch = not dry_run and batch_size > 1
+    pending: list[RowJob] = []
+    seen: set[tuple[str, str]] = set()
+
+    def log_validation(log_writer: JsonlWriter, job: RowJob, result: GetResult) -> None:
+        """Tally a validate-mode result, sort it into the eligible/ineligible CSVs, and log it."""
+        idx = job.idx
+        token = job.token
+        package_name = job.package_name
+        product = job.product
+        order_id = job.order_id
+        subscription_id = job.subscription_id
+        totals[totals_key(result.status, result.http_status)] += 1
+
+        payload = result.payload or {}
+        subscription_state = payload.get("subscriptionState")
+        line_items = payload.get("lineItems") or []
+        expiry_time = None
+        auto_renew_enabled = None
+        latest_order_id = payload.get("latestOrderId")
+        if line_items:
+            expiry_time = line_items[0].get("expiryTime")
+            auto_plan = line_items[0].get("autoRenewingPlan") or {}
+            auto_renew_enabled = auto_plan.get("autoRenewEnabled")
+            if line_items[0].get("latestSuccessfulOrderId"):
+                latest_order_id = line_items[0].get("latestSuccessfulOrderId")
+
+        eligible = subscription_state in ELIGIBLE_STATES
+        if eligible_writer and eligible:
+            eligible_writer.writerow(
+                (
+                    token,
+                    package_name,
+                    product,
+                    order_id,
+                    subscription_state,
+                    expiry_time,
+                    auto_renew_enabled,
+                    latest_order_id,
+                )
+            )
+        elif ineligible_writer:
+            ineligible_writer.writerow(
+                (
+                    token,
+                    package_name,
+                    product,
+                    order_id,
+                    subscription_state,
+                    expiry_time,
+                    auto_renew_enabled,
+                    latest_order_id,
+                    result.status,
+                    result.http_status,
+                    result.error_type,
+                    result.message,
+                )
+            )
+
+        record = {
+            "timestamp": now_iso(),
+            "purchaseToken": token,
+            "subscriptionId": subscription_id,
+            "package": package_name,
+            "product": product,
+            "order_id": order_id,
+            "status": result.status,
+            "attempts": result.attempts,
+            "httpStatus": result.http_status,
+            "errorType": result.error_type,
+            "message": result.message,
+            "subscriptionState": subscription_state,
+            "expiryTime": expiry_time,
+            "autoRenewEnabled": auto_renew_enabled,
+            "latestOrderId": latest_order_id,
+            "eligibleForRevoke": eligible,
+            "rowIndex": idx,
+        }
+        if log_response and result.payload is not None:
+            record["response"] = result.payload
+        log_writer.append(record)
+
+    def log_action(log_writer: JsonlWriter, job: RowJob, result: CancelResult) -> None:
+        """Tally and log a cancel or revoke result."""
+        totals[totals_key(result.status, result.http_status, result.error_type)] += 1
+        log_writer.append(
+            {
+                "timestamp": now_iso(),
+                "purchaseToken": job.token,
+                "subscriptionId": job.subscription_id,
+                "package": job.package_name,
+                "product": job.product,
+                "order_id": job.order_id,
+                "status": result.status,
+                "attempts": result.attempts,
+                "httpStatus": result.http_status,
+                "errorType": result.error_type,
+                "message": result.message,
+                "rowIndex": job.idx,
+            }
         )
-        ineligible_writer.writeheader()
 
-    with open(log_path, "w") as log_fh:
-        for idx, row in enumerate(rows, start=1):
-            if args.max_rows and totals["processed"] >= args.max_rows:
-                break
+    # The mode is fixed for the run, so pick its handlers once instead of
+    # branching on it for every row.
+    log_result = log_validation if mode == "validate" else log_action
 
-            token = (row.get(token_field) or "").strip()
-            if not token:
-                sys.stderr.write(f"Row {idx}: missing token, skipping\n")
-                totals["skipped"] += 1
-                continue
+    def finish(log_writer: JsonlWriter, job: RowJob, result: Any) -> None:
+        """Log and checkpoint one row once its API result is known."""
+        log_result(log_writer, job, result)
 
-            if token in processed_tokens:
-                totals["skipped"] += 1
-                continue
+        if not dry_run:
+            if result.status == "success":
+                if checkpoint_success_fh:
+                    append_checkpoint(checkpoint_success_fh, job.token)
+                    processed_tokens.add(job.token)
+            elif checkpoint_failed_fh:
+                append_checkpoint(checkpoint_failed_fh, job.token)
 
-            package_name = pick_package(row, package_field, args.package_name)
-            if not package_name:
-                sys.stderr.write(f"Row {idx}: missing package, skipping\n")
-                totals["skipped"] += 1
-                continue
+        if count_rows:
+            progress.update(1)
 
-            if args.package_name and package_name != args.package_name:
-                sys.stderr.write(
-                    f"Row {idx}: package mismatch ({package_name}), skipping\n"
-                )
-                totals["skipped"] += 1
+    worker_state = threading.local()
+
+    def worker_client():
+        """
+        Each worker thread gets its own client; httplib2 connections are not
+        thread-safe. Returns (service, service.purchases().subscriptionsv2()).
+        """
+        client = getattr(worker_state, "client", None)
+        if client is None:
+            try:
+                svc = spare_clients.pop()
+            except IndexError:
+                svc = build_service(credentials)
+            client = worker_state.client = (svc, svc.purchases().subscriptionsv2())
+        return client
+
+    def call_api(jobs: list[RowJob]) -> list[Any]:
+        """Run the mode's API call(s) for one unit of work on a worker thread."""
+        svc, endpoint = worker_client()
+        if use_batch:
+            return batch_with_retries(
+                service=svc,
+                mode=mode,
+                jobs=[(job.package_name, job.token) for job in jobs],
+                retries=retries,
+                backoff=backoff,
+                jitter=jitter,
+                fields=fields,
+            )
+        return [
+            call_with_retries(
+                endpoint=endpoint,
+                mode=mode,
+                package_name=job.package_name,
+                token=job.token,
+                retries=retries,
+                backoff=backoff,
+                jitter=jitter,
+                fields=fields,
+            )
+            for job in jobs
+        ]
+
+    backoff = backoff_schedule(args.retries, args.backoff)
+
+    # Up to --concurrency units run at once, with as many again queued so no
+    # worker idles while the main thread records results in input order.
+    # The queued half costs nothing on Ctrl-C: settle() cancels units that
+    # have not started, so only the running ones (at most --concurrency)
+    # still reach the API, and they are logged.
+    max_in_flight = 2 * args.concurrency
+    in_flight: deque[tuple[list[RowJob], Future]] = deque()
+
+    def drain(log_writer, limit: int) -> None:
+        """Record finished units, oldest first, until at most `limit` are in flight."""
+        while len(in_flight) > limit:
+            jobs, future = in_flight[0]
+            results = future.result()  # Left queued until it returns, for settle()
+            in_flight.popleft()
+            for job, result in zip(jobs, results):
+                finish(log_writer, job, result)
+
+    def settle(log_writer) -> None:
+        """
+        Wind down after Ctrl-C or an error: cancel queued units that have not
+        started, then wait for the running ones and record them in order, so
+        every call that reached the API is in the log and checkpoints.
+        """
+        for _, future in reversed(in_flight):
+            future.cancel()
+        while in_flight:
+            jobs, future = in_flight.popleft()
+            if future.cancelled():
                 continue
+            try:
+                results = future.result()
+            except Exception:  # Nothing to record; the original error propagates
+                continue
+            for job, result in zip(jobs, results):
+                finish(log_writer, job, result)
+
+    def submit(log_writer, executor: ThreadPoolExecutor, jobs: list[RowJob]) -> None:
+        in_flight.append((jobs, executor.submit(call_api, jobs)))
+        drain(log_writer, max_in_flight)
+
+    # How a row is handed off, chosen once for the run.
+    if dry_run:
+        dry_result = (
+            GetResult(status="dry_run", attempts=0)
+            if mode == "validate"
+            else CancelResult(status="dry_run", attempts=0)
+        )
 
-            product = pick_field(row, product_field)
-            order_id = pick_field(row, order_id_field)
-            subscription_id = (
-                (row.get(subscription_field) or "").strip() if subscription_field else None
-            )
+        def dispatch(log_writer, executor: ThreadPoolExecutor, job: RowJob) -> None:
+            finish(log_writer, job, dry_result)
 
-            totals["processed"] += 1
-            if args.mode == "validate":
-                if args.dry_run:
-                    get_result = GetResult(status="dry_run", attempts=0)
-                else:
-                    get_result = get_with_retries(
-                        service=service,
-                        package_name=package_name,
-                        token=token,
-                        retries=args.retries,
-                        base_backoff=args.backoff,
-                        jitter=args.jitter,
+    elif use_batch:
+
+        def dispatch(log_writer, executor: ThreadPoolExecutor, job: RowJob) -> None:
+            # Queue the call; the batch goes out once it is full (or at the end).
+            pending.append(job)
+            if len(pending) >= batch_size:
+                submit(log_writer, executor, pending[:])
+                pending.clear()
+
+    else:
+
+        def dispatch(log_writer, executor: ThreadPoolExecutor, job: RowJob) -> None:
+            submit(log_writer, executor, [job])
+
+    checkpoint_fhs = [fh for fh in (checkpoint_success_fh, checkpoint_failed_fh) if fh]
+    with JsonlWriter(
+        log_path, append=args.resume, companions=checkpoint_fhs
+    ) as log_writer, ThreadPoolExecutor(
+        max_workers=args.concurrency
+    ) as executor:
+        try:
+            for idx, row in enumerate(rows, start=1):
+                if max_rows and totals["processed"] >= max_rows:
+                    break
+
+                # Cells are stripped here rather than in project_row: a package
+                # cell of only whitespace must skip the row, not fall back to
+                # --package-name the way an empty cell does.
+                token, row_package, product, order_id, subscription_id = row
+                token = (token or "").strip()
+                if not token:
+                    sys.stderr.write(f"Row {idx}: missing token, skipping\n")
+                    totals["skipped"] += 1
+                    continue
+
+                if token in processed_tokens:
+                    totals["skipped"] += 1
+                    continue
+
+                package_name = row_package.strip() if row_package else expected_package
+                if not package_name:
+                    sys.stderr.write(f"Row {idx}: missing package, skipping\n")
+                    totals["skipped"] += 1
+                    continue
+
+                if expected_package and package_name != expected_package:
+                    sys.stderr.write(
+                        f"Row {idx}: package mismatch ({package_name}), skipping\n"
                     )
-                result = None
-            elif args.dry_run:
-                result = CancelResult(status="dry_run", attempts=0)
-                get_result = None
-            elif args.mode == "revoke-prorated":
-                get_result = None
-                result = revoke_prorated_with_retries(
-                    service=service,
-                    package_name=package_name,
+                    totals["skipped"] += 1
+                    continue
+
+                # Repeats of a (package, token) pair already queued this run would
+                # only repeat the same API call; keep the first row's metadata.
+                key = (package_name, token)
+                if key in seen:
+                    totals["skipped"] += 1
+                    totals["duplicates"] += 1
+                    continue
+                seen.add(key)
+
+                job = RowJob(
+                    idx=idx,
                     token=token,
-                    retries=args.retries,
-                    base_backoff=args.backoff,
-                    jitter=args.jitter,
-                )
-            else:
-                get_result = None
-                result = cancel_with_retries(
-                    service=service,
                     package_name=package_name,
-                    token=token,
-                    retries=args.retries,
-                    base_backoff=args.backoff,
-                    jitter=args.jitter,
+                    product=product.strip() if product is not None else None,
+                    order_id=order_id.strip() if order_id is not None else None,
+                    subscription_id=(
+                        (subscription_id or "").strip() if subscription_idx is not None else None
+                    ),
                 )
 
-            if args.mode == "validate" and get_result:
-                if get_result.status == "success":
-                    totals["success"] += 1
-                elif get_result.status == "dry_run":
-                    totals["dry_run"] += 1
-                elif get_result.http_status in RETRY_STATUS:
-                    totals["failed_transient"] += 1
-                else:
-                    totals["failed_permanent"] += 1
-
-                payload = get_result.payload or {}
-                subscription_state = payload.get("subscriptionState")
-                line_items = payload.get("lineItems") or []
-                expiry_time = None
-                auto_renew_enabled = None
-                latest_order_id = payload.get("latestOrderId")
-                if line_items:
-                    expiry_time = line_items[0].get("expiryTime")
-                    auto_plan = line_items[0].get("autoRenewingPlan") or {}
-                    auto_renew_enabled = auto_plan.get("autoRenewEnabled")
-                    if line_items[0].get("latestSuccessfulOrderId"):
-                        latest_order_id = line_items[0].get("latestSuccessfulOrderId")
-
-                eligible = subscription_state in ELIGIBLE_STATES
-                if eligible_writer and eligible:
-                    eligible_writer.writerow(
-                        {
-                            "token": token,
-                            "package": package_name,
-                            "product": product,
-                            "order_id": order_id,
-                            "subscription_state": subscription_state,
-                            "expiry_time": expiry_time,
-                            "auto_renew_enabled": auto_renew_enabled,
-                            "latest_order_id": latest_order_id,
-                        }
-                    )
-                elif ineligible_writer:
-                    ineligible_writer.writerow(
-                        {
-                            "token": token,
-                            "package": package_name,
-                            "product": product,
-                            "order_id": order_id,
-                            "subscription_state": subscription_state,
-                            "expiry_time": expiry_time,
-                            "auto_renew_enabled": auto_renew_enabled,
-                            "latest_order_id": latest_order_id,
-                            "status": get_result.status,
-                            "http_status": get_result.http_status,
-                            "error_type": get_result.error_type,
-                            "message": get_result.message,
-                        }
-                    )
+                totals["processed"] += 1
+                dispatch(log_writer, executor, job)
 
-                record = {
-                    "timestamp": now_iso(),
-                    "purchaseToken": token,
-                    "subscriptionId": subscription_id,
-                    "package": package_name,
-                    "product": product,
-                    "order_id": order_id,
-                    "status": get_result.status,
-                    "attempts": get_result.attempts,
-                    "httpStatus": get_result.http_status,
-                    "errorType": get_result.error_type,
-                    "message": get_result.message,
-                    "subscriptionState": subscription_state,
-                    "expiryTime": expiry_time,
-                    "autoRenewEnabled": auto_renew_enabled,
-                    "latestOrderId": latest_order_id,
-                    "eligibleForRevoke": eligible,
-                    "rowIndex": idx,
-                }
-                if args.log_response and get_result.payload is not None:
-                    record["response"] = get_result.payload
-                log_record(log_fh, record)
-            else:
-                if result is None:
-                    result = CancelResult(status="dry_run", attempts=0)
-
-                if result.status == "success":
-                    totals["success"] += 1
-                elif result.status == "dry_run":
-                    totals["dry_run"] += 1
-                elif result.error_type == "already_cancelled":
-                    totals["already_cancelled"] += 1
-                elif result.http_status in RETRY_STATUS:
-                    totals["failed_transient"] += 1
-                else:
-                    totals["failed_permanent"] += 1
-
-                record = {
-                    "timestamp": now_iso(),
-                    "purchaseToken": token,
-                    "subscriptionId": subscription_id,
-                    "package": package_name,
-                    "product": product,
-                    "order_id": order_id,
-                    "status": result.status,
-                    "attempts": result.attempts,
-                    "httpStatus": result.http_status,
-                    "errorType": result.error_type,
-                    "message": result.message,
-                    "rowIndex": idx,
-                }
-                log_record(log_fh, record)
-
-            if not args.dry_run:
-                success = (
-                    (args.mode == "validate" and get_result and get_result.status == "success")
-                    or (args.mode != "validate" and result and result.status == "success")
-                )
-                if success and checkpoint_success_fh:
-                    append_checkpoint(checkpoint_success_fh, token)
-                    processed_tokens.add(token)
-                elif not success and checkpoint_failed_fh:
-                    append_checkpoint(checkpoint_failed_fh, token)
-
-            if args.delay > 0:
-                time.sleep(args.delay)
-            progress.update(1)
+                if pace:
+                    pace()
+
+            if pending:
+                submit(log_writer, executor, pending[:])
+                pending.clear()
+            drain(log_writer, 0)
+        finally:
+            settle(log_writer)
 
     if eligible_fh:
         eligible_fh.close()
@@ -914,13 +1416,18 @@ def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
         "--delay",
         type=float,
         default=0.15,
-        help="Fixed delay between processed rows (seconds).",
+        help="Target spacing between processed rows (seconds); sets the default --rps to 1/delay.",
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        help="Maximum average rows per second, enforced with a token bucket (default: 1/--delay; 0 = unlimited).",
     )
     parser.add_argument(
         "--retries",
         type=int,
         default=3,
-        help="Number of retries for transient HTTP statuses.",
+        help="Number of retries for transient HTTP statuses and transport errors.",
     )
     parser.add_argument(
         "--backoff",
@@ -944,6 +1451,24 @@ def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
         type=int,
         help="Randomly process N rows (reservoir sampling).",
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Random seed for --sample-size, to draw the same sample again.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help=f"Send up to N API calls per batched HTTP request (default: 50, max {BATCH_LIMIT}; 1 disables batching).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of API requests (or batches) in flight at once (default: 8).",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -954,6 +1479,11 @@ def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Include full API response payload in validation logs.",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run: append to --log and skip tokens it already records (transient and transport failures are retried).",
+    )
     parser.add_argument(
         "--checkpoint",
         help="File path to track processed tokens for resume support (success only).",
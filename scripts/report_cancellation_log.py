@@ -7,9 +7,20 @@ from __future__ import annotations
 import argparse
 import csv
 import json
+import mmap
+import os
+import re
 import sys
 from collections import Counter
-from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
+from typing import Dict, Iterable, Optional
+
+try:
+    import orjson  # Optional: faster JSONL parsing
+except ImportError:
+    orjson = None
 
 
 FIELDS = [
@@ -33,57 +44,198 @@ FIELDS = [
 ]
 
 
-def load_records(path: str):
-    with open(path) as fh:
-        for line_no, line in enumerate(fh, start=1):
-            line = line.strip()
+def iter_lines(fh, start: int = 0, end: Optional[int] = None):
+    """
+    Yield the lines of a binary file, optionally only those starting in [start, end).
+
+    Memory-maps the file and splits it with mmap.readline, which measured
+    faster than iterating the buffered file object. Falls back to reading
+    the file object for files that cannot be mapped (empty files, pipes).
+    A line that straddles `start` belongs to the range before it.
+    """
+    try:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        if start == 0 and end is None:
+            yield from fh
+            return
+        mm = None
+    src = mm if mm is not None else fh
+    try:
+        if start > 0:
+            src.seek(start - 1)
+            src.readline()  # Skip to the first line that starts at or after `start`
+        if end is None:
+            yield from iter(src.readline, b"")
+            return
+        while src.tell() < end:
+            line = src.readline()
             if not line:
+                break
+            yield line
+    finally:
+        if mm is not None:
+            mm.close()
+
+
+# First "status" key on a line. cancel_subscriptions.py writes flat records
+# with status ahead of the optional nested "response", and a quote inside a
+# string value is escaped, so the first match is the record's own status.
+# Logs contain both json.dumps (": ") and orjson (":") separators.
+_STATUS_RE = re.compile(rb'"status":\s*"([^"\\]*)"')
+# The same assumption for the two keys summarize reads from a failure. A
+# value these do not match (an escaped string, a missing key) sends the
+# line to the JSON parser instead.
+_ERROR_TYPE_RE = re.compile(rb'"errorType":\s*(?:"([^"\\]*)"|null)')
+_HTTP_STATUS_RE = re.compile(rb'"httpStatus":\s*(?:(\d+)|null)')
+
+
+def load_records(
+    path: str, start: int = 0, end: Optional[int] = None, status_only: bool = False
+):
+    """
+    Yield parsed records from the JSONL log, or from the lines starting in [start, end).
+
+    With status_only, lines skip JSON decoding and yield a shared dict of
+    just the keys summarize reads: {"status": ...} for most lines, plus
+    errorType and httpStatus for failures. This assumes the flat, valid
+    JSON objects cancel_subscriptions.py writes; lines that do not fit the
+    patterns below are parsed as usual.
+    """
+    # Read bytes: both parsers accept them, and orjson is fastest without a decode step.
+    loads = orjson.loads if orjson is not None else json.loads
+    status_search = _STATUS_RE.search
+    error_type_search = _ERROR_TYPE_RE.search
+    http_status_search = _HTTP_STATUS_RE.search
+    status_records: Dict[bytes, Dict] = {}
+    failure_records: Dict[tuple, Dict] = {}
+    where = "line" if start == 0 else f"bytes {start}-{end}, line"
+    # 1 MiB buffer for when iter_lines falls back to reading the file object.
+    with open(path, "rb", buffering=1 << 20) as fh:
+        for line_no, line in enumerate(iter_lines(fh, start, end), start=1):
+            if status_only:
+                match = status_search(line)
+                raw = match[1] if match else b"failure"
+                # The closing brace check leaves lines cut short by a crash to the parser.
+                if match and line.rstrip().endswith(b"}"):
+                    if raw != b"failure":
+                        rec = status_records.get(raw)
+                        if rec is None:
+                            rec = status_records[raw] = {"status": raw.decode("utf-8")}
+                        yield rec
+                        continue
+                    error_match = error_type_search(line)
+                    http_match = http_status_search(line)
+                    if error_match and http_match:
+                        key = (error_match[1], http_match[1])
+                        rec = failure_records.get(key)
+                        if rec is None:
+                            rec = failure_records[key] = {
+                                "status": "failure",
+                                "errorType": key[0].decode("utf-8") if key[0] is not None else None,
+                                "httpStatus": int(key[1]) if key[1] is not None else None,
+                            }
+                        yield rec
+                        continue
+            if not line.strip():
                 continue
             try:
-                yield json.loads(line)
-            except json.JSONDecodeError as exc:
-                sys.stderr.write(f"Skipping malformed JSON on line {line_no}: {exc}\n")
+                yield loads(line)
+            except ValueError as exc:  # JSONDecodeError from either parser, bad UTF-8
+                sys.stderr.write(f"Skipping malformed JSON on {where} {line_no}: {exc}\n")
                 continue
 
 
-def summarize(records):
+def open_csv(stack: ExitStack, path: str):
+    """Open an export CSV on `stack`, write the FIELDS header, and return its csv.writer."""
+    fh = stack.enter_context(open(path, "w", newline=""))
+    writer = csv.writer(fh)
+    writer.writerow(FIELDS)
+    return writer
+
+
+def summarize(records: Iterable[Dict], all_writer=None, failures_writer=None):
+    """
+    Count records by status, and failures by errorType/httpStatus, without keeping them.
+
+    Records are also written to the given CSV writers as they stream past
+    (failures only to failures_writer), so exports need no second read.
+    """
+    total = 0
     status_counts = Counter()
-    error_counts = Counter()
-    http_counts = Counter()
-    all_rows: List[Dict] = []
+    # Failures are counted once per (errorType, httpStatus) pair and split
+    # into the two breakdowns after the loop: one dict update per failure
+    # instead of two. Splitting in insertion order keeps most_common() ties
+    # in first-seen order.
+    failure_pairs = Counter()
+    # CSV rows are map(rec.get, FIELDS, blanks): the FIELDS values in order,
+    # "" where missing, projected in C and consumed by the writer directly.
+    fields = FIELDS
+    blanks = repeat("")
+    # Bound .get methods: d[k] = get(k, 0) + 1 is a little cheaper per record
+    # than Counter's d[k] += 1, which runs on every line of the log.
+    status_get = status_counts.get
+    pair_get = failure_pairs.get
     for rec in records:
+        total += 1
         status = rec.get("status", "unknown")
-        status_counts[status] += 1
+        status_counts[status] = status_get(status, 0) + 1
+        if all_writer is not None:
+            all_writer.writerow(map(rec.get, fields, blanks))
         if status == "failure":
-            error_counts[rec.get("errorType", "unknown")] += 1
-            http_counts[str(rec.get("httpStatus", "unknown"))] += 1
-        all_rows.append(rec)
-    return all_rows, status_counts, error_counts, http_counts
-
-
-def write_csv(path: str, rows, failures_only: bool = False):
-    with open(path, "w", newline="") as fh:
-        writer = csv.DictWriter(fh, fieldnames=FIELDS)
-        writer.writeheader()
-        for row in rows:
-            if failures_only and row.get("status") != "failure":
-                continue
-            writer.writerow({k: row.get(k, "") for k in FIELDS})
+            # httpStatus is kept as parsed (int, None, or "unknown");
+            # print_summary formats it, so no str() per failure.
+            pair = (rec.get("errorType", "unknown"), rec.get("httpStatus", "unknown"))
+            failure_pairs[pair] = pair_get(pair, 0) + 1
+            if failures_writer is not None:
+                failures_writer.writerow(map(rec.get, fields, blanks))
+
+    error_counts = Counter()
+    http_counts = Counter()
+    for (error_type, http_status), count in failure_pairs.items():
+        error_counts[error_type] += count
+        http_counts[http_status] += count
+    return total, status_counts, error_counts, http_counts
+
+
+def summarize_range(path: str, start: int, end: int):
+    """Summarize the log lines starting in [start, end); worker for --jobs."""
+    return summarize(load_records(path, start, end, status_only=True))
+
+
+def summarize_parallel(path: str, jobs: int):
+    """
+    Summarize the log in `jobs` worker processes, one byte range each.
+
+    Counts are additive, so the per-range Counters are merged in file order;
+    that keeps most_common() tie order the same as a single pass.
+    """
+    size = os.path.getsize(path)
+    bounds = [size * i // jobs for i in range(jobs + 1)]
+    total = 0
+    status_counts = Counter()
+    error_counts = Counter()
+    http_counts = Counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for part in pool.map(summarize_range, repeat(path), bounds[:-1], bounds[1:]):
+            total += part[0]
+            status_counts.update(part[1])
+            error_counts.update(part[2])
+            http_counts.update(part[3])
+    return total, status_counts, error_counts, http_counts
 
 
 def print_summary(status_counts: Counter, error_counts: Counter, http_counts: Counter, total: int):
-    print("---- Log summary ----")
-    print(f"Total records: {total}")
-    for status, count in status_counts.most_common():
-        print(f"{status}: {count}")
+    # Built up front and written once, rather than one print() per line.
+    lines = ["---- Log summary ----", f"Total records: {total}"]
+    lines.extend(f"{status}: {count}" for status, count in status_counts.most_common())
     if error_counts:
-        print("\nFailure breakdown by errorType:")
-        for err, count in error_counts.most_common():
-            print(f"  {err}: {count}")
+        lines.append("\nFailure breakdown by errorType:")
+        lines.extend(f"  {err}: {count}" for err, count in error_counts.most_common())
     if http_counts:
-        print("\nFailure breakdown by httpStatus:")
-        for code, count in http_counts.most_common():
-            print(f"  {code}: {count}")
+        lines.append("\nFailure breakdown by httpStatus:")
+        lines.extend(f"  {code}: {count}" for code, count in http_counts.most_common())
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def parse_args():
@@ -91,18 +243,34 @@ def parse_args():
     parser.add_argument("--log", required=True, help="Path to JSONL log file produced by cancel_subscriptions.py")
     parser.add_argument("--failures-csv", help="Optional path to write failures-only CSV (tokens, errors, etc.)")
     parser.add_argument("--all-csv", help="Optional path to write all rows to CSV.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Count the log in N worker processes (summary only; ignored when writing CSVs).",
+    )
     return parser.parse_args()
 
 
 def main(argv: Optional[list[str]] = None) -> None:
     args = parse_args()
-    records, status_counts, error_counts, http_counts = summarize(load_records(args.log))
-    print_summary(status_counts, error_counts, http_counts, total=len(records))
+    if args.jobs > 1 and not args.failures_csv and not args.all_csv and os.path.isfile(args.log):
+        total, status_counts, error_counts, http_counts = summarize_parallel(args.log, args.jobs)
+        print_summary(status_counts, error_counts, http_counts, total=total)
+        return
+    # One pass over the log: count and write any requested CSVs as records stream by.
+    with ExitStack() as stack:
+        failures_writer = open_csv(stack, args.failures_csv) if args.failures_csv else None
+        all_writer = open_csv(stack, args.all_csv) if args.all_csv else None
+        total, status_counts, error_counts, http_counts = summarize(
+            load_records(args.log, status_only=all_writer is None and failures_writer is None),
+            all_writer,
+            failures_writer,
+        )
+    print_summary(status_counts, error_counts, http_counts, total=total)
     if args.failures_csv:
-        write_csv(args.failures_csv, records, failures_only=True)
         print(f"Wrote failures CSV: {args.failures_csv}")
     if args.all_csv:
-        write_csv(args.all_csv, records, failures_only=False)
         print(f"Wrote full CSV: {args.all_csv}")
 
 